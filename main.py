@@ -10,20 +10,32 @@ API highlights:
 - FileSystem.create_user(username)
 - FileSystem.mkdir(path, username)
 - FileSystem.write_file(path, username, data)
+- FileSystem.append_file(path, username, data)
 - FileSystem.read_file(path, username) -> data
+- FileSystem.read_file_view(path, username) -> memoryview
 - FileSystem.list_dir(path, username) -> [names]
+- FileSystem.list_dir_detailed(path, username) -> [(name, node)]
 - FileSystem.move(src_path, dest_path, username)
+- FileSystem.owner_name(node) -> username
 
 Run this module as a script for a small demo and self-checks.
 """
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional, List, Union
-import os
+from typing import Callable, ClassVar, Dict, Optional, List, Tuple, Union
+import functools
+import stat
 import sys
 
 
+# uid owning the root directory, also given to a user named "root"; other
+# users get uids from 1 up
+_ROOT_UID = 0
+# uid used for reads by names that were never registered with create_user
+_ANON_UID = -1
+
+
 class FsError(Exception):
     pass
 
@@ -32,30 +44,168 @@ class FsPermissionError(FsError, PermissionError):
     pass
 
 
-def _split_path(path: str) -> List[str]:
-    p = os.path.normpath(path)
-    if p == ".":
-        return []
-    if p.startswith(os.sep):
-        p = p[1:]
-    return [part for part in p.split(os.sep) if part]
+@functools.lru_cache(maxsize=4096)
+def _split_path(path: str) -> Tuple[str, ...]:
+    # pure function of the path string, so results are memoized; returns a
+    # tuple so cached values can be shared safely between callers. Components
+    # are interned so entry lookups can hit the dict identity fast path.
+    # Paths are always "/"-separated and resolved from the root, so this
+    # skips os.path.normpath; ".." above the root stays at the root.
+    parts = [part for part in path.split("/") if part and part != "."]
+    if ".." in parts:
+        stack: List[str] = []
+        for part in parts:
+            if part == "..":
+                if stack:
+                    stack.pop()
+            else:
+                stack.append(part)
+        parts = stack
+    return tuple(sys.intern(part) for part in parts)
 
 
-@dataclass
+@functools.lru_cache(maxsize=4096)
+def _path_key(path: str) -> str:
+    # normalized absolute form of path, used as the FileSystem index key
+    return "/" + "/".join(_split_path(path))
+
+
+# Node.kind values, so hot paths can test node type with an int compare
+# instead of isinstance
+DIR_KIND = 0
+FILE_KIND = 1
+
+
+# slots drop the per-node __dict__; dataclass(slots=True) needs Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class Node:
+    kind: ClassVar[int] = DIR_KIND
     name: str
-    owner: str
+    owner_id: int  # uid of the owning user, see FileSystem.create_user
     mode: int  # unix-style permission bits, e.g. 0o755 or 0o644
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class File(Node):
-    content: bytes = b""
+    kind: ClassVar[int] = FILE_KIND
+    # mutable so appends extend in place instead of copying the whole file
+    content: bytearray = field(default_factory=bytearray)
 
 
-@dataclass
+# Owners may always read and write their own nodes; everyone else goes by
+# the "others" bits (groups are not modelled). The owner test comes first
+# since it is the common case.
+def _can_read(node: Node, uid: int) -> bool:
+    return uid == node.owner_id or bool(node.mode & stat.S_IROTH)
+
+
+def _can_write(node: Node, uid: int) -> bool:
+    return uid == node.owner_id or bool(node.mode & stat.S_IWOTH)
+
+
+def _to_buffer(data: Union[str, bytes]) -> bytearray:
+    # encode straight into a file buffer, skipping an intermediate bytes
+    return bytearray(data, "utf-8") if isinstance(data, str) else bytearray(data)
+
+
+class SortedEntries(Dict[str, Node]):
+    """Directory entry mapping that caches its sorted key list.
+
+    The cache is dropped whenever a name is added or removed, so repeated
+    listings of an unchanged directory skip the sort.
+    """
+
+    # left unset until the first listing, so construction stays at dict speed
+    __slots__ = ("_sorted_names",)
+
+    def sorted_names(self) -> List[str]:
+        names: Optional[List[str]] = getattr(self, "_sorted_names", None)
+        if names is None:
+            names = self._sorted_names = sorted(self)
+        return list(names)
+
+    def __setitem__(self, key: str, value: Node) -> None:
+        if key not in self:
+            self._sorted_names = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._sorted_names = None
+
+    def pop(self, *args):
+        self._sorted_names = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self._sorted_names = None
+        return super().popitem()
+
+    def setdefault(self, key: str, default=None):
+        if key not in self:
+            self._sorted_names = None
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        self._sorted_names = None
+        super().update(*args, **kwargs)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        self._sorted_names = None
+        super().clear()
+
+
+@dataclass(**_SLOTS)
 class Directory(Node):
-    entries: Dict[str, Node] = field(default_factory=dict)
+    entries: SortedEntries = field(default_factory=SortedEntries)
+
+
+class _PathTrie:
+    """Trie over path components recording which paths are in the index.
+
+    Every trie node corresponds to a cached path, so dropping a child link
+    forgets that whole cached subtree in O(depth + number of dropped paths).
+    """
+
+    __slots__ = ("children", "value", "key")
+
+    def __init__(self, value: Node, key: str):
+        self.children: Dict[str, _PathTrie] = {}
+        self.value = value
+        self.key = key  # index key of this path ("" for the root)
+
+    def longest_prefix(self, parts: Tuple[str, ...]) -> Tuple[_PathTrie, int]:
+        """Return the deepest cached trie node along parts and its depth."""
+        t = self
+        depth = 0
+        for part in parts:
+            child = t.children.get(part)
+            if child is None:
+                break
+            t = child
+            depth += 1
+        return t, depth
+
+    def invalidate(self, parts: Tuple[str, ...]) -> List[str]:
+        """Forget the cached subtree at parts, returning the index keys dropped."""
+        t, depth = self.longest_prefix(parts[:-1])
+        if depth < len(parts) - 1:
+            return []
+        dropped = t.children.pop(parts[-1], None)
+        keys: List[str] = []
+        stack = [dropped] if dropped is not None else []
+        while stack:
+            t = stack.pop()
+            keys.append(t.key)
+            stack.extend(t.children.values())
+        return keys
 
 
 class FileSystem:
@@ -64,163 +214,259 @@ class FileSystem:
     def __init__(self):
         self.users: Dict[str, Dict] = {}
         # root directory - make world-writable so users can create top-level dirs
-        self.root = Directory(name="/", owner="root", mode=0o777)
+        self.root = Directory(name="/", owner_id=_ROOT_UID, mode=0o777)
+        self._user_names: Dict[int, str] = {_ROOT_UID: "root"}
+        self._next_uid = _ROOT_UID
+        # normalized absolute path -> node, filled lazily by _get_node for the
+        # paths actually looked up; _cache_trie mirrors its keys so a move
+        # can drop a cached subtree without scanning the whole index
+        self._index: Dict[str, Node] = {"/": self.root}
+        self._cache_trie = _PathTrie(self.root, "")
 
     def create_user(self, username: str):
         if username in self.users:
             return
-        self.users[username] = {"name": username}
+        username = sys.intern(username)
+        if username == "root":
+            # a registered root user owns / like before uids were introduced
+            uid = _ROOT_UID
+        else:
+            self._next_uid += 1
+            uid = self._next_uid
+        self.users[username] = {"name": username, "uid": uid}
+        self._user_names[uid] = username
+
+    def _uid(self, username: str) -> int:
+        user = self.users.get(username)
+        if user is None:
+            raise FsError(f"unknown user: {username}")
+        return user["uid"]
+
+    def _reader_uid(self, username: str) -> int:
+        # reads don't require a registered user; unknown users only get the
+        # "others" permissions
+        user = self.users.get(username)
+        return _ANON_UID if user is None else user["uid"]
+
+    def owner_name(self, node: Node) -> str:
+        return self._user_names[node.owner_id]
 
     def _get_node(self, path: str) -> Node:
+        node = self._index.get(_path_key(path))
+        if node is not None:
+            return node
+        # resume the walk from the deepest cached ancestor, caching each step
         parts = _split_path(path)
-        cur: Node = self.root
-        for part in parts:
-            if not isinstance(cur, Directory):
+        t, depth = self._cache_trie.longest_prefix(parts)
+        cur = t.value
+        for part in parts[depth:]:
+            if cur.kind != DIR_KIND:
                 raise FileNotFoundError(path)
-            if part not in cur.entries:
+            nxt = cur.entries.get(part)  # type: ignore
+            if nxt is None:
                 raise FileNotFoundError(path)
-            cur = cur.entries[part]
+            cur = nxt
+            child = t.children[part] = _PathTrie(cur, f"{t.key}/{part}")
+            self._index[child.key] = cur
+            t = child
         return cur
 
-    def _get_parent_dir(self, path: str) -> Directory:
+    def _walk_dirs(self, parts: Tuple[str, ...], path: str) -> List[Directory]:
+        """Return the directories visited walking parts from the root, root first."""
+        stack = [self.root]
+        cur = self.root
+        for part in parts:
+            nxt = cur.entries.get(part)
+            if nxt is None or nxt.kind != DIR_KIND:
+                raise FileNotFoundError(path)
+            cur = nxt
+            stack.append(cur)
+        return stack
+
+    def _resolve(
+        self, path: str, partial_stack: Optional[List[Directory]] = None
+    ) -> Tuple[Directory, str, Optional[Node]]:
+        """Walk to the parent of path once, returning (parent, name, node or None).
+
+        The root resolves to (root, "", root). partial_stack, as returned by
+        _walk_dirs for a prefix of the parent path, lets the walk resume from
+        the deepest already-resolved ancestor instead of the root.
+        """
         parts = _split_path(path)
         if not parts:
-            return self.root
-        parent_parts = parts[:-1]
-        cur: Node = self.root
-        for part in parent_parts:
-            if not isinstance(cur, Directory):
-                raise FileNotFoundError(path)
-            if part not in cur.entries:
-                raise FileNotFoundError(path)
-            cur = cur.entries[part]
-        if not isinstance(cur, Directory):
-            raise FileNotFoundError(path)
-        return cur
-
-    def _check_perm(self, node: Node, username: str, perm: str) -> bool:
-        # perm in {'r','w','x'}
-        perms_map = {"r": 4, "w": 2, "x": 1}
-        bit = perms_map[perm]
-        if username == node.owner:
-            shift = 6
+            return self.root, "", self.root
+        if partial_stack:
+            cur = partial_stack[-1]
+            skip = len(partial_stack) - 1
         else:
-            # we don't model groups; check "others"
-            shift = 0
-        return bool((node.mode >> shift) & bit)
+            cur = self.root
+            skip = 0
+        entries = cur.entries
+        for part in parts[skip:-1]:
+            nxt = entries.get(part)
+            if nxt is None or nxt.kind != DIR_KIND:
+                raise FileNotFoundError(path)
+            cur = nxt
+            entries = cur.entries
+        last = parts[-1]
+        return cur, last, entries.get(last)
 
     def mkdir(self, path: str, username: str, mode: int = 0o755):
-        if username not in self.users:
-            raise FsError(f"unknown user: {username}")
+        uid = self._uid(username)
         if path == "/" or path == "":
             return
         parts = _split_path(path)
         cur = self.root
         for i, part in enumerate(parts):
-            if part not in cur.entries:
+            node = cur.entries.get(part)
+            if node is None:
                 # to create here, current user must have write permission on cur
-                if not self._check_perm(cur, username, "w") and username != cur.owner:
+                if not _can_write(cur, uid):
                     raise FsPermissionError("permission denied")
-                # create directory
-                newdir = Directory(name=part, owner=username, mode=mode)
-                cur.entries[part] = newdir
-                cur = newdir
+                # everything below is new as well and owned by this user, so
+                # the remaining directories need no lookups or permission checks
+                for name in parts[i:]:
+                    newdir = Directory(name=name, owner_id=uid, mode=mode)
+                    cur.entries[name] = newdir
+                    cur = newdir
+                return
+            if node.kind == DIR_KIND:
+                cur = node
             else:
-                node = cur.entries[part]
-                if isinstance(node, Directory):
-                    cur = node
-                else:
-                    raise FsError("path component is a file")
-
-    def write_file(self, path: str, username: str, data: Union[str, bytes], mode: int = 0o644):
-        if username not in self.users:
-            raise FsError(f"unknown user: {username}")
-        parts = _split_path(path)
-        if not parts:
+                raise FsError("path component is a file")
+
+    def _writable_target(
+        self, path: str, username: str
+    ) -> Tuple[Directory, str, Optional[File], int]:
+        """Resolve path for writing, returning (parent, name, existing file or None, uid).
+
+        Checks write permission on the parent and, if the file exists, on the file.
+        """
+        uid = self._uid(username)
+        parent, name, existing = self._resolve(path)
+        if not name:
             raise FsError("cannot write to root")
-        parent = self._get_parent_dir(path)
         # need write permission on parent to create/overwrite
-        if not self._check_perm(parent, username, "w") and username != parent.owner:
+        if not _can_write(parent, uid):
             raise FsPermissionError("permission denied")
+        if existing is not None:
+            if existing.kind == DIR_KIND:
+                raise FsError("path is a directory")
+            # check write permission on file
+            if not _can_write(existing, uid):
+                raise FsPermissionError("permission denied")
+        return parent, name, existing, uid  # type: ignore
+
+    def write_file(self, path: str, username: str, data: Union[str, bytes], mode: int = 0o644):
+        parent, name, existing, uid = self._writable_target(path, username)
+        content = _to_buffer(data)
+        if existing is None:
+            parent.entries[name] = File(name=name, owner_id=uid, mode=mode, content=content)
+        else:
+            existing.content = content
 
-        name = parts[-1]
-        existing = parent.entries.get(name)
-        data_bytes = data.encode() if isinstance(data, str) else data
+    def append_file(self, path: str, username: str, data: Union[str, bytes], mode: int = 0o644):
+        """Append data to the file at path, creating it if it does not exist."""
+        parent, name, existing, uid = self._writable_target(path, username)
+        content = _to_buffer(data)
         if existing is None:
-            # create new file
-            f = File(name=name, owner=username, mode=mode, content=data_bytes)
-            parent.entries[name] = f
+            parent.entries[name] = File(name=name, owner_id=uid, mode=mode, content=content)
             return
-        if isinstance(existing, Directory):
-            raise FsError("path is a directory")
-        # check write permission on file
-        if not self._check_perm(existing, username, "w") and username != existing.owner:
-            raise FsPermissionError("permission denied")
-        if isinstance(existing, File):
-            existing.content = data_bytes
+        try:
+            existing.content.extend(content)
+        except BufferError:
+            # a read_file_view is still holding the buffer, so it cannot
+            # be resized; switch the file to a fresh buffer instead
+            existing.content = existing.content + content
 
-    def read_file(self, path: str, username: str) -> bytes:
+    def _readable_file(self, path: str, username: str) -> File:
         node = self._get_node(path)
-        if isinstance(node, Directory):
+        if node.kind == DIR_KIND:
             raise FsError("path is a directory")
-        if not self._check_perm(node, username, "r") and username != node.owner:
+        if not _can_read(node, self._reader_uid(username)):
             raise FsPermissionError("permission denied")
-        return node.content # type: ignore
+        return node # type: ignore
+
+    def read_file(self, path: str, username: str) -> bytes:
+        return bytes(self._readable_file(path, username).content)
+
+    def read_file_view(self, path: str, username: str) -> memoryview:
+        """Return a read-only, zero-copy view of the file contents.
+
+        Writes made while the view is held do not show through it.
+        """
+        return memoryview(self._readable_file(path, username).content).toreadonly()
         
 
-    def list_dir(self, path: str, username: str) -> List[str]:
+    def _readable_dir(self, path: str, username: str) -> Directory:
         node = self._get_node(path) if path not in ("", "/") else self.root
-        if not isinstance(node, Directory):
+        if node.kind != DIR_KIND:
             raise FsError("not a directory")
-        if not self._check_perm(node, username, "r") and username != node.owner:
+        if not _can_read(node, self._reader_uid(username)):
             raise FsPermissionError("permission denied")
-        return sorted(node.entries.keys())
+        return node
+
+    def list_dir(self, path: str, username: str) -> List[str]:
+        return self._readable_dir(path, username).entries.sorted_names()
+
+    def list_dir_detailed(self, path: str, username: str) -> List[Tuple[str, Node]]:
+        """Like list_dir, but pair each name with its node without re-walking the path."""
+        entries = self._readable_dir(path, username).entries
+        return [(name, entries[name]) for name in entries.sorted_names()]
 
     def move(self, src_path: str, dest_path: str, username: str):
         """Move a file or directory from src_path to dest_path."""
-        if username not in self.users:
-            raise FsError(f"unknown user: {username}")
+        uid = self._uid(username)
         
-        # Get source node and its parent
+        # Walk the ancestors shared by both parents once and resume from there
         src_parts = _split_path(src_path)
-        if not src_parts:
-            raise FsError("cannot move root")
+        dest_parts = _split_path(dest_path)
+        n = 0
+        for a, b in zip(src_parts[:-1], dest_parts[:-1]):
+            if a != b:
+                break
+            n += 1
+        shared = self._walk_dirs(src_parts[:n], src_path)
         
-        src_parent = self._get_parent_dir(src_path)
-        src_name = src_parts[-1]
+        # Get source node and its parent
+        src_parent, src_name, src_node = self._resolve(src_path, shared)
+        if not src_name:
+            raise FsError("cannot move root")
         
-        if src_name not in src_parent.entries:
+        if src_node is None:
             raise FileNotFoundError(src_path)
         
         # Check write permission on source parent (to remove from it)
-        if not self._check_perm(src_parent, username, "w") and username != src_parent.owner:
+        if not _can_write(src_parent, uid):
             raise FsPermissionError(f"permission denied on source parent")
         
-        src_node = src_parent.entries[src_name]
-        
         # Get destination parent
-        dest_parts = _split_path(dest_path)
-        if not dest_parts:
+        dest_parent, dest_name, dest_node = self._resolve(dest_path, shared)
+        if not dest_name:
             raise FsError("cannot move to root")
         
-        dest_parent = self._get_parent_dir(dest_path)
-        dest_name = dest_parts[-1]
-        
         # Check write permission on destination parent
-        if not self._check_perm(dest_parent, username, "w") and username != dest_parent.owner:
+        if not _can_write(dest_parent, uid):
             raise FsPermissionError(f"permission denied on destination parent")
         
         # Check if destination exists
-        if dest_name in dest_parent.entries:
+        if dest_node is not None:
             raise FsError(f"destination already exists: {dest_path}")
         
         # Perform the move
+        for key in self._cache_trie.invalidate(src_parts):
+            del self._index[key]
         del src_parent.entries[src_name]
         src_node.name = dest_name
         dest_parent.entries[dest_name] = src_node
 
 
 def _demo_and_tests():
+    # path tokenizing: "." is skipped and ".." pops, clamping at the root
+    assert _split_path("/a/../b/./c/") == ("b", "c")
+    assert _split_path("../..") == ()
+    assert _split_path("../a") == ("a",)
+
     fs = FileSystem()
     fs.create_user("alice")
     fs.create_user("bob")
@@ -245,6 +491,7 @@ def _demo_and_tests():
     node.mode = 0o644  # owner rw, others r
     content = fs.read_file("/docs/readme.txt", "bob")
     assert content.decode() == "Hello from Alice"
+    assert fs.read_file_view("/docs/readme.txt", "bob") == content
 
     # bob can create his own file
     fs.write_file("/docs/todo.txt", "bob", "- buy milk")
@@ -257,27 +504,162 @@ def _demo_and_tests():
     assert "todo.txt" not in fs.list_dir("/docs", "alice")
     assert "todo.txt" in fs.list_dir("/bob_files", "bob")
 
+    # appending extends the existing contents
+    fs.append_file("/bob_files/todo.txt", "bob", "\n- buy eggs")
+    assert fs.read_file("/bob_files/todo.txt", "bob") == b"- buy milk\n- buy eggs"
+
+    # moving an ancestor of an already looked-up path drops the cached entry
+    fs.mkdir("/x/y", "alice")
+    fs.write_file("/x/y/f", "alice", "nested")
+    assert fs.read_file("/x/y/f", "alice") == b"nested"
+    fs.move("/x/y", "/w", "alice")
+    try:
+        fs.read_file("/x/y/f", "alice")
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("moved path should no longer resolve")
+    assert fs.read_file("/w/f", "alice") == b"nested"
+
     print("Demo checks passed. Example directory listing (/docs):")
-    for name in fs.list_dir("/docs", "alice"):
-        node = fs._get_node(f"/docs/{name}")
-        typ = "dir" if isinstance(node, Directory) else "file"
-        print(f" - {name} ({typ}) owner={node.owner} mode={oct(node.mode)}")
+    for name, node in fs.list_dir_detailed("/docs", "alice"):
+        typ = "dir" if node.kind == DIR_KIND else "file"
+        print(f" - {name} ({typ}) owner={fs.owner_name(node)} mode={oct(node.mode)}")
+
+
+@dataclass
+class _CliState:
+    user: Optional[str] = None
+    running: bool = True
+
+
+def _require_user(state: _CliState) -> bool:
+    if not state.user:
+        print("Please select a user first with 'user <name>'")
+        return False
+    return True
+
+
+def _cmd_exit(fs: FileSystem, args: str, state: _CliState):
+    print("Goodbye!")
+    state.running = False
+
+
+def _cmd_adduser(fs: FileSystem, args: str, state: _CliState):
+    if not args:
+        print("Usage: adduser <username>")
+        return
+    fs.create_user(args)
+    print(f"User '{args}' created.")
+
+
+def _cmd_user(fs: FileSystem, args: str, state: _CliState):
+    if not args:
+        print("Usage: user <username>")
+        return
+    if args not in fs.users:
+        print(f"User '{args}' does not exist. Use 'adduser {args}' first.")
+        return
+    state.user = args
+    print(f"Switched to user '{state.user}'")
+
+
+def _cmd_whoami(fs: FileSystem, args: str, state: _CliState):
+    if state.user:
+        print(state.user)
+    else:
+        print("No user selected. Use 'user <name>' to switch.")
+
+
+def _cmd_mkdir(fs: FileSystem, args: str, state: _CliState):
+    if not _require_user(state):
+        return
+    if not args:
+        print("Usage: mkdir <path>")
+        return
+    fs.mkdir(args, state.user)
+    print(f"Directory '{args}' created.")
+
+
+def _cmd_write(fs: FileSystem, args: str, state: _CliState):
+    if not _require_user(state):
+        return
+    arg_parts = args.split(maxsplit=1)
+    if len(arg_parts) < 2:
+        print("Usage: write <path> <text>")
+        return
+    path, text = arg_parts
+    fs.write_file(path, state.user, text)
+    print(f"File '{path}' written.")
+
+
+def _cmd_ls(fs: FileSystem, args: str, state: _CliState):
+    if not _require_user(state):
+        return
+    path = args if args else "/"
+    entries = fs.list_dir_detailed(path, state.user)
+    if not entries:
+        print("(empty)")
+    else:
+        for name, node in entries:
+            typ = "dir " if node.kind == DIR_KIND else "file"
+            print(f"  {typ} {name}")
+
+
+def _cmd_cat(fs: FileSystem, args: str, state: _CliState):
+    if not _require_user(state):
+        return
+    if not args:
+        print("Usage: read <path>")
+        return
+    content = fs.read_file(args, state.user)
+    print(content.decode())
+
+
+def _cmd_mv(fs: FileSystem, args: str, state: _CliState):
+    if not _require_user(state):
+        return
+    arg_parts = args.split()
+    if len(arg_parts) != 2:
+        print("Usage: mv <src_path> <dest_path>")
+        return
+    src, dest = arg_parts
+    fs.move(src, dest, state.user)
+    print(f"Moved '{src}' to '{dest}'")
+
+
+# CLI command name -> handler(fs, args, state)
+DISPATCH: Dict[str, Callable[[FileSystem, str, _CliState], None]] = {
+    "exit": _cmd_exit,
+    "quit": _cmd_exit,
+    "adduser": _cmd_adduser,
+    "user": _cmd_user,
+    "whoami": _cmd_whoami,
+    "mkdir": _cmd_mkdir,
+    "write": _cmd_write,
+    "ls": _cmd_ls,
+    "list": _cmd_ls,
+    "read": _cmd_cat,
+    "cat": _cmd_cat,
+    "mv": _cmd_mv,
+    "move": _cmd_mv,
+}
 
 
 def _interactive_cli():
     """Simple CLI for interacting with the filesystem."""
     fs = FileSystem()
-    current_user = None
+    state = _CliState()
     
     print("=== In-Memory POSIX-like Filesystem CLI ===")
     print("Commands: adduser <name>, user <name>, mkdir <path>, write <path> <text>,")
     print("          cat <path>, ls <path>, mv <src> <dest>, whoami, exit")
     print()
     
-    while True:
+    while state.running:
         try:
-            if current_user:
-                line = input(f"{current_user}> ").strip()
+            if state.user:
+                line = input(f"{state.user}> ").strip()
             else:
                 line = input("(no user)> ").strip()
         except (EOFError, KeyboardInterrupt):
@@ -291,99 +673,12 @@ def _interactive_cli():
         cmd = parts[0].lower()
         args = parts[1] if len(parts) > 1 else ""
         
+        handler = DISPATCH.get(cmd)
+        if handler is None:
+            print(f"Unknown command: {cmd}")
+            continue
         try:
-            if cmd in ("exit", "quit"):
-                print("Goodbye!")
-                break
-            
-            elif cmd == "adduser":
-                if not args:
-                    print("Usage: adduser <username>")
-                    continue
-                fs.create_user(args)
-                print(f"User '{args}' created.")
-            
-            elif cmd == "user":
-                if not args:
-                    print("Usage: user <username>")
-                    continue
-                if args not in fs.users:
-                    print(f"User '{args}' does not exist. Use 'adduser {args}' first.")
-                    continue
-                current_user = args
-                print(f"Switched to user '{current_user}'")
-            
-            elif cmd == "whoami":
-                if current_user:
-                    print(current_user)
-                else:
-                    print("No user selected. Use 'user <name>' to switch.")
-            
-            elif cmd == "mkdir":
-                if not current_user:
-                    print("Please select a user first with 'user <name>'")
-                    continue
-                if not args:
-                    print("Usage: mkdir <path>")
-                    continue
-                fs.mkdir(args, current_user)
-                print(f"Directory '{args}' created.")
-            
-            elif cmd == "write":
-                if not current_user:
-                    print("Please select a user first with 'user <name>'")
-                    continue
-                arg_parts = args.split(maxsplit=1)
-                if len(arg_parts) < 2:
-                    print("Usage: write <path> <text>")
-                    continue
-                path, text = arg_parts
-                fs.write_file(path, current_user, text)
-                print(f"File '{path}' written.")
-            
-            elif cmd in ("ls", "list"):
-                if not current_user:
-                    print("Please select a user first with 'user <name>'")
-                    continue
-                path = args if args else "/"
-                entries = fs.list_dir(path, current_user)
-                if not entries:
-                    print("(empty)")
-                else:
-                    for name in entries:
-                        full_path = f"{path}/{name}".replace("//", "/")
-                        try:
-                            node = fs._get_node(full_path)
-                            typ = "dir " if isinstance(node, Directory) else "file"
-                            print(f"  {typ} {name}")
-                        except:
-                            print(f"  ?    {name}")
-            
-            elif cmd in ("read", "cat"):
-                if not current_user:
-                    print("Please select a user first with 'user <name>'")
-                    continue
-                if not args:
-                    print("Usage: read <path>")
-                    continue
-                content = fs.read_file(args, current_user)
-                print(content.decode())
-            
-            elif cmd in ("mv", "move"):
-                if not current_user:
-                    print("Please select a user first with 'user <name>'")
-                    continue
-                arg_parts = args.split()
-                if len(arg_parts) != 2:
-                    print("Usage: mv <src_path> <dest_path>")
-                    continue
-                src, dest = arg_parts
-                fs.move(src, dest, current_user)
-                print(f"Moved '{src}' to '{dest}'")
-            
-            else:
-                print(f"Unknown command: {cmd}")
-        
+            handler(fs, args, state)
         except FsPermissionError as e:
             print(f"Permission denied: {e}")
         except FileNotFoundError as e: